@@ -2,28 +2,139 @@
 
 import streamlit as st
 import requests
-import difflib
 import re
 import os
 import json
-from datetime import datetime
-from typing import Dict, List, Tuple
+import math
+import hashlib
+import html
+import queue
+import sqlite3
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from array import array
+from collections import OrderedDict, deque
+from itertools import accumulate
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from urllib3.util.retry import Retry
 
 # API Configuration
-API_KEY = os.getenv("CLAUDE_API_KEY") or st.secrets["API_KEY"]
 API_ENDPOINT = "https://api.anthropic.com/v1/messages"
+BATCHES_ENDPOINT = "https://api.anthropic.com/v1/messages/batches"
+API_TIMEOUT = (5, 60)  # seconds to connect, and between bytes of the response
+INFLIGHT_WAIT = 60  # seconds to wait for an identical request from another session
+MAX_CONCURRENT_REQUESTS = 8  # parallel API requests, also the HTTP connection pool size
+# Timeouts, lock conflicts, rate limits, server errors and overload (529)
+RETRY_STATUSES = (408, 409, 429, 500, 502, 503, 504, 529)
+# The subset that means the API did not process the request, so a POST can be resent safely
+UNPROCESSED_STATUSES = (408, 409, 429, 529)
+
+# Request settings shared by every Messages API call; callers add system and messages
+BASE_PAYLOAD = {
+    "model": "claude-haiku-4-5",
+    "max_tokens": 1000,
+    "temperature": 0.0
+}
+# Proofreading gets a little latitude in phrasing; translation stays deterministic
+REVIEW_TEMPERATURE = 0.2
+# Output length follows input length, so max_tokens is scaled to the text within these bounds
+MIN_OUTPUT_TOKENS = 64
+OUTPUT_TOKENS_PER_WORD = 4
 
 # Reference Sources
-REFERENCE_SITES = [
+REFERENCE_SITES = (
     "https://www.miljodirektoratet.no/ansvarsomrader/klima/fns-klimapanel-ipcc/dette-sier-fns-klimapanel/klimabegreper-pa-norsk/",
     "https://www.ipcc.ch/glossary/",
     "https://unfccc.int/process-and-meetings/the-convention/glossary-of-climate-change-acronyms-and-terms"
-]
+)
+SOURCES_BLOCK = "\n".join(f"- {site}" for site in REFERENCE_SITES)
+
+# Translation instructions, sent as a cacheable system prompt formatted with the reference sources
+SYSTEM_PROMPT_NO_TO_EN = """You are a specialist in translating climate negotiation texts from Norwegian to English. Your task is to:
+
+        1. First check the reference pages for how similar concepts and expressions are translated:
+        {sources}
+
+        2. For technical terms:
+        - Use established English translations from authoritative sources
+        - For terms without direct translations, describe the concept in English and keep Norwegian term in parentheses
+        - When multiple translations exist, use the most widely accepted one
+        - Maintain consistency with IPCC and UNFCCC terminology
+
+        3. Focus on conveying the same meaning as the original text, not word-for-word translation
+
+        4. Ensure the translation:
+        - Uses appropriate formal language for climate negotiations
+        - Maintains technical precision
+        - Follows standard English capitalization and punctuation rules
+        - Preserves any specific references to Norwegian policies or institutions
+
+        Note: Pay special attention to how technical terms are used in IPCC reports and UNFCCC documents.
+
+        Output only the translation, keeping the paragraph breaks of the original, without explanations."""
+
+SYSTEM_PROMPT_EN_TO_NO = """Du er en spesialist i å oversette klimaforhandlingstekster fra engelsk til norsk. Din oppgave er å:
+
+        1. Først sjekke referansesidene for hvordan lignende begreper og uttrykk er oversatt:
+        {sources}
+
+        2. For tekniske termer:
+        - Bruk etablerte norske oversettelser fra referansesidene
+        - For termer som ikke finnes i kildene, beskriv konseptet på norsk og behold engelsk term i parentes
+        - Ved flere brukte oversettelser, vis alternativene
+
+        3. Fokuser på å formidle samme mening som i originalteksten, ikke ord-for-ord oversettelse
+
+        Tips: Se spesielt etter hvordan Miljødirektoratet og Regjeringen formulerer lignende konsepter.
+
+        Svar kun med oversettelsen, med samme avsnittsinndeling som originalen, uten forklaringer."""
+
+# Per-request part of the translation prompts, formatted with the text to translate
+USER_PROMPT_NO_TO_EN = """Translate this text from Norwegian to English:
+{text}"""
 
-# Initialize session state
-if 'translation_memory' not in st.session_state:
-    st.session_state.translation_memory = {}
+USER_PROMPT_EN_TO_NO = """Oversett denne teksten:
+{text}"""
 
+# Review instructions, sent as a cacheable system prompt ahead of the text to review
+SYSTEM_PROMPT_REVIEW = """Du er en ekspert på norsk klimaterminologi. 
+    Korriger følgende tekst med fokus på:
+    - Presist og korrekt fagspråk i klimaforhandlinger
+    - Konsistent bruk av tekniske termer
+    - Korrekt grammatikk og tegnsetting
+    - Formelt språk passende for offisielle dokumenter
+    
+    Gi kun korrigert versjon uten forklaringer.
+    Behold tekniske termer som er korrekte."""
+
+# Sidebar options that translate, mapped to their translation direction
+TRANSLATION_DIRECTIONS = {
+    "Norwegian to English": "no-to-en",
+    "English to Norwegian": "en-to-no",
+}
+
+# Letters that should not survive a Norwegian to English translation
+NORWEGIAN_CHARS_PATTERN = re.compile('[æøåÆØÅ]')
+
+# Translation memory size limit, shared across all sessions
+MAX_TM_ENTRIES = 10_000
+# Identical API requests are answered from memory, up to this many responses
+MAX_CACHED_RESPONSES = 512
+# On-disk translation memory, kept across restarts
+TM_DB_PATH = os.getenv("TM_DB_PATH", "translation_memory.db")
+TM_EXPIRY = timedelta(days=7)
+# Expired rows are deleted from the store at most this often
+TM_PURGE_INTERVAL = timedelta(hours=1)
+# Set ALLOW_TM_CLEAR=1 to show the button that wipes the shared memory for everyone
+ALLOW_TM_CLEAR = os.getenv("ALLOW_TM_CLEAR") == "1"
+# Direction recorded for raw API responses kept in the same store, keyed by payload digest
+RESPONSE_CACHE_DIRECTION = "response"
+# Batch items carry a translation direction, or this task for proofreading
+REVIEW_TASK = "review"
+
+@st.cache_data
 def load_technical_terms():
     """Load technical terms and their translations."""
     return {
@@ -34,6 +145,52 @@ def load_technical_terms():
         "karbonbudsjett": "carbon budget",
     }
 
+class TermAutomaton:
+    """Aho-Corasick automaton that finds every known term in a single pass over a text."""
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List] = [[]]
+
+    def add_word(self, word: str, value) -> None:
+        """Add a term to the trie; call make_automaton() once all terms are added."""
+        node = 0
+        for char in word:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = child
+        self._output[node].append(value)
+
+    def make_automaton(self) -> None:
+        """Compute failure links breadth-first so matching never backtracks in the text."""
+        nodes = deque(self._goto[0].values())
+        while nodes:
+            node = nodes.popleft()
+            for char, child in self._goto[node].items():
+                nodes.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def iter(self, text: str):
+        """Yield (end_index, value) for every term occurrence in text."""
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for value in output[node]:
+                yield index, value
+
 class TranslationQuality:
     def __init__(self):
         self.reference_sites = REFERENCE_SITES
@@ -69,6 +226,19 @@ class TranslationQuality:
                 "reference": self.reference_sites[1]
             }
         }
+        # Lowercased forms are fixed, so compute them once instead of per check
+        self._term_items_lower = tuple(
+            (term.lower(), details['english'].lower(), term, details)
+            for term, details in self.technical_terms.items()
+        )
+        self._automaton = TermAutomaton()
+        for term_lower, english_lower, term, details in self._term_items_lower:
+            self._automaton.add_word(term_lower, (english_lower, term, details))
+        self._automaton.make_automaton()
+
+    def find_terms(self, text: str) -> List[str]:
+        """Return the technical terms found in text, in order of first appearance."""
+        return list(dict.fromkeys(item[1] for _, item in self._automaton.iter(text.lower())))
 
     def validate_translation(self, original: str, translated: str, direction: str) -> List[Dict]:
         """Enhanced validation that includes existing checks plus new ones."""
@@ -76,8 +246,11 @@ class TranslationQuality:
         
         # Technical term checks
         if direction == "no-to-en":
-            for term, details in self.technical_terms.items():
-                if term.lower() in original.lower() and details['english'].lower() not in translated.lower():
+            original_lower = original.lower()
+            translated_lower = translated.lower()
+            found_terms = {item[1]: item for _, item in self._automaton.iter(original_lower)}
+            for english_lower, term, details in found_terms.values():
+                if english_lower not in translated_lower:
                     issues.append({
                         'type': 'technical_term',
                         'severity': 'high',
@@ -87,7 +260,8 @@ class TranslationQuality:
                     })
         
         # Formatting checks
-        if len(translated.split()) < len(original.split()) * 0.5:
+        # str.split() is the cheapest exact word count; each text is split once
+        if 2 * len(translated.split()) < len(original.split()):
             issues.append({
                 'type': 'formatting',
                 'severity': 'medium',
@@ -96,8 +270,7 @@ class TranslationQuality:
         
         # Norwegian character check
         if direction == "no-to-en":
-            norwegian_chars = set('æøåÆØÅ')
-            if any(char in translated for char in norwegian_chars):
+            if NORWEGIAN_CHARS_PATTERN.search(translated):
                 issues.append({
                     'type': 'formatting',
                     'severity': 'high',
@@ -106,147 +279,672 @@ class TranslationQuality:
         
         return issues
 
+@st.cache_resource
+def get_quality_checker() -> TranslationQuality:
+    """Get the shared quality checker, built once per process."""
+    return TranslationQuality()
+
+@st.cache_resource
+def get_api_key() -> Optional[str]:
+    """Get the Claude API key from the environment or Streamlit secrets, looked up once per process."""
+    api_key = os.getenv("CLAUDE_API_KEY")
+    if api_key:
+        return api_key
+    try:
+        return st.secrets["API_KEY"]
+    except (KeyError, FileNotFoundError):
+        return None
+
+class ApiRetry(Retry):
+    """Retry policy that resends a POST only when the API did not process it."""
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method == "POST" and status_code not in UNPROCESSED_STATUSES:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """Get a shared HTTP session so API calls reuse pooled keep-alive connections."""
+    session = requests.Session()
+    session.headers.update({
+        "anthropic-version": "2023-06-01",
+        "x-api-key": get_api_key(),
+        "content-type": "application/json",
+    })
+    # Connection failures and the error statuses Anthropic's own clients retry are retried with
+    # exponential backoff, honouring Retry-After. Read errors and server errors on a POST are not,
+    # since a POST that reached the API may have been billed.
+    retries = ApiRetry(
+        total=3, read=0, backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES, allowed_methods=("GET", "POST"), raise_on_status=False
+    )
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=4, pool_maxsize=MAX_CONCURRENT_REQUESTS, max_retries=retries
+    )
+    session.mount("https://", adapter)
+    return session
+
+def encode_payload(payload: Dict) -> bytes:
+    """Serialize an API payload as compact UTF-8 JSON, leaving Norwegian letters unescaped."""
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def cached_system_prompt(text: str) -> List[Dict]:
+    """Wrap a fixed system prompt so the API can reuse its prefill across requests."""
+    return [{"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}]
+
+def output_token_budget(text: str) -> int:
+    """Size max_tokens to the text so a runaway response cannot decode far past it."""
+    return max(MIN_OUTPUT_TOKENS, min(OUTPUT_TOKENS_PER_WORD * len(text.split()), BASE_PAYLOAD["max_tokens"]))
+
+def post_message(payload: Dict, stream: bool = False) -> requests.Response:
+    """Send a Messages API request over the shared session."""
+    return get_http_session().post(
+        API_ENDPOINT,
+        data=encode_payload(payload),
+        timeout=API_TIMEOUT,
+        stream=stream
+    )
+
+@st.cache_data(ttl=600)
+def find_technical_terms(text: str) -> List[str]:
+    """Find technical terms in text, cached so unrelated reruns skip the scan."""
+    return get_quality_checker().find_terms(text)
+
 # Part 2: Translation Memory and Core Translation Functions
 
-def get_word_diffs(original: str, suggested: str) -> List[Dict]:
-    """Get word-level differences between original and suggested texts."""
-    def split_into_words(text):
-        return re.findall(r'\S+|\s+', text)
-    
-    original_words = split_into_words(original)
-    suggested_words = split_into_words(suggested)
-    
-    matcher = difflib.SequenceMatcher(None, original_words, suggested_words)
+# Words and the whitespace between them, so diffs can rebuild the exact text
+WORD_PATTERN = re.compile(r'\S+|\s+')
+split_into_words = WORD_PATTERN.findall
+# Blank lines separate paragraphs that are translated and cached independently
+PARAGRAPH_PATTERN = re.compile(r'\n\s*\n')
+# Translation memory keys keep line structure but ignore spacing within lines and blank-line runs
+HORIZONTAL_SPACE_PATTERN = re.compile(r'[^\S\n]+')
+BLANK_LINES_PATTERN = re.compile(r'\s*\n\s*\n\s*')
+
+# Larger diffs cap the edit search like git's xdiff, trading minimality for bounded time
+MAX_EXACT_DIFF_TOKENS = 400
+MIN_DIFF_COST = 256
+
+def encode_tokens(tokens: List[str], vocab: Dict[str, int]) -> array:
+    """
+    Map tokens to integer ids so the diff loop compares ints instead of strings.
+
+    Ids are only meaningful within one vocab, so both sides of a diff must share it.
+    """
+    intern = vocab.setdefault
+    return array('i', [intern(token, len(vocab)) for token in tokens])
+
+def blocks_to_opcodes(blocks: List[Tuple[int, int, int]], n: int, m: int) -> List[Tuple[str, int, int, int, int]]:
+    """Turn ordered (i, j, length) matching blocks into difflib-style opcodes."""
+    opcodes = []
+    i = j = 0
+    for block_i, block_j, length in blocks + [(n, m, 0)]:
+        if i < block_i and j < block_j:
+            opcodes.append(('replace', i, block_i, j, block_j))
+        elif i < block_i:
+            opcodes.append(('delete', i, block_i, j, block_j))
+        elif j < block_j:
+            opcodes.append(('insert', i, block_i, j, block_j))
+        i, j = block_i + length, block_j + length
+        if length:
+            opcodes.append(('equal', block_i, i, block_j, j))
+    return opcodes
+
+def myers_blocks(a: array, b: array, max_cost: int) -> Tuple[List[Tuple[int, int, int]], int, int]:
+    """
+    Align a and b with Myers' algorithm, stopping after max_cost edits.
+
+    Returns the matching (i, j, length) blocks and the point (x, y) the alignment
+    reached, which is (len(a), len(b)) unless the search ran out of budget first.
+    """
+    n, m = len(a), len(b)
+    offset = n + m + 1
+    # v[offset + k] is the furthest x reached on diagonal k = x - y
+    v = [0] * (2 * offset + 1)
+    trace = []
+    for d in range(min(n + m, max_cost) + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]
+            else:
+                x = v[offset + k - 1] + 1
+            y = x - k
+            while x < n and y < m and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                break
+        trace.append(v[offset - d:offset + d + 1])
+        if x >= n and y >= m:
+            break
+    else:
+        # Out of budget: stop at the furthest point reached within the grid
+        x, y = max(
+            ((v[offset + k], v[offset + k] - k) for k in range(-d, d + 1, 2)
+             if v[offset + k] <= n and v[offset + k] - k <= m),
+            key=lambda point: point[0] + point[1]
+        )
+    end_x, end_y = x, y
+
+    # Walk the frontiers backwards, collecting the diagonal runs of matched tokens
+    blocks = []
+    for d in range(len(trace) - 1, 0, -1):
+        previous = trace[d - 1]
+        k = x - y
+        if k == -d or (k != d and previous[k - 1 + d - 1] < previous[k + 1 + d - 1]):
+            previous_k = k + 1
+            mid_x = previous[previous_k + d - 1]
+        else:
+            previous_k = k - 1
+            mid_x = previous[previous_k + d - 1] + 1
+        if x > mid_x:
+            blocks.append((mid_x, mid_x - k, x - mid_x))
+        x = previous[previous_k + d - 1]
+        y = x - previous_k
+    if x > 0:
+        blocks.append((0, 0, x))
+    blocks.reverse()
+    return blocks, end_x, end_y
+
+def myers_opcodes(a: array, b: array) -> List[Tuple[str, int, int, int, int]]:
+    """
+    Compute difflib-style opcodes from a shortest edit script between a and b.
+
+    Uses Myers' algorithm, which runs in O((N+M)D) for D edits, so near-identical
+    texts are aligned in close to linear time. For large inputs each search stops
+    after a bounded number of edits and the rest is diffed again from where it
+    stopped, so sparse edits still come out as separate changes.
+    """
+    n, m = len(a), len(b)
+    if n + m <= MAX_EXACT_DIFF_TOKENS:
+        max_cost = n + m
+    else:
+        max_cost = max(MIN_DIFF_COST, math.isqrt(n + m))
+
+    blocks = []
+    x = y = 0
+    # Every pass makes at least max_cost edits' worth of progress, so this terminates
+    while x < n or y < m:
+        pass_blocks, pass_x, pass_y = myers_blocks(a[x:], b[y:], max_cost)
+        blocks.extend((i + x, j + y, length) for i, j, length in pass_blocks)
+        x += pass_x
+        y += pass_y
+    return blocks_to_opcodes(blocks, n, m)
+
+def diff_words(original_words: List[str], suggested_words: List[str]) -> List[Dict]:
+    """Diff two token lists into change dicts."""
+    n, m = len(original_words), len(suggested_words)
+
+    # Only the region between the shared head and tail needs diffing
+    head = 0
+    while head < min(n, m) and original_words[head] == suggested_words[head]:
+        head += 1
+    tail = 0
+    while tail < min(n, m) - head and original_words[n - 1 - tail] == suggested_words[m - 1 - tail]:
+        tail += 1
+
+    vocab: Dict[str, int] = {}
+    opcodes = [
+        (tag, i1 + head, i2 + head, j1 + head, j2 + head)
+        for tag, i1, i2, j1, j2 in myers_opcodes(
+            encode_tokens(original_words[head:n - tail], vocab),
+            encode_tokens(suggested_words[head:m - tail], vocab)
+        )
+    ]
+    if head:
+        opcodes.insert(0, ('equal', 0, head, 0, head))
+    if tail:
+        opcodes.append(('equal', n - tail, n, m - tail, m))
+
+    # Token offsets let each change be one string slice instead of a list slice and join
+    original_text, suggested_text = ''.join(original_words), ''.join(suggested_words)
+    original_offsets = [0, *accumulate(map(len, original_words))]
+    suggested_offsets = [0, *accumulate(map(len, suggested_words))]
     changes = []
     
-    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+    for tag, i1, i2, j1, j2 in opcodes:
         if tag == 'replace':
             changes.append({
                 'type': 'change',
-                'original': ''.join(original_words[i1:i2]),
-                'suggested': ''.join(suggested_words[j1:j2])
+                'original': original_text[original_offsets[i1]:original_offsets[i2]],
+                'suggested': suggested_text[suggested_offsets[j1]:suggested_offsets[j2]]
             })
         elif tag == 'delete':
             changes.append({
                 'type': 'deletion',
-                'original': ''.join(original_words[i1:i2]),
+                'original': original_text[original_offsets[i1]:original_offsets[i2]],
                 'suggested': ''
             })
         elif tag == 'insert':
             changes.append({
                 'type': 'insertion',
                 'original': '',
-                'suggested': ''.join(suggested_words[j1:j2])
+                'suggested': suggested_text[suggested_offsets[j1]:suggested_offsets[j2]]
             })
         elif tag == 'equal':
             changes.append({
                 'type': 'equal',
-                'text': ''.join(original_words[i1:i2])
+                'text': original_text[original_offsets[i1]:original_offsets[i2]]
             })
     return changes
 
+@st.cache_data(max_entries=256, ttl=3600, show_spinner=False)
+def get_word_diffs(original: str, suggested: str) -> List[Dict]:
+    """Get word-level differences between original and suggested texts."""
+    if original == suggested:
+        return [{'type': 'equal', 'text': original}] if original else []
+
+    original_words = split_into_words(original)
+    suggested_words = split_into_words(suggested)
+    if len(original_words) + len(suggested_words) <= MAX_EXACT_DIFF_TOKENS:
+        return diff_words(original_words, suggested_words)
+
+    # Large texts: align whole lines first, then word-diff only the lines that changed
+    original_lines = original.splitlines(keepends=True)
+    suggested_lines = suggested.splitlines(keepends=True)
+    changes = []
+    vocab: Dict[str, int] = {}
+    for tag, i1, i2, j1, j2 in myers_opcodes(encode_tokens(original_lines, vocab), encode_tokens(suggested_lines, vocab)):
+        if tag == 'equal':
+            hunk = [{'type': 'equal', 'text': ''.join(original_lines[i1:i2])}]
+        else:
+            hunk = diff_words(
+                split_into_words(''.join(original_lines[i1:i2])),
+                split_into_words(''.join(suggested_lines[j1:j2]))
+            )
+        for change in hunk:
+            if change['type'] == 'equal' and changes and changes[-1]['type'] == 'equal':
+                changes[-1]['text'] += change['text']
+            else:
+                changes.append(change)
+    return changes
+
+class LRUCache:
+    """Thread-safe mapping that evicts the least recently used entry beyond maxsize."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the value for key and mark it as recently used."""
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def add(self, key, value) -> bool:
+        """Store value unless key is already present; return whether it was stored."""
+        with self._lock:
+            if key in self._data:
+                return False
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return True
+
+    def discard(self, key) -> None:
+        """Remove key if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class TranslationMemoryStore:
+    """SQLite-backed translation memory; writes are queued and applied by a background thread."""
+
+    def __init__(self, path: str):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key BLOB PRIMARY KEY, translation TEXT NOT NULL, "
+            "timestamp TEXT NOT NULL, direction TEXT NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.commit()
+        self._next_purge = datetime.now()
+        threading.Thread(target=self._write_loop, daemon=True).start()
+
+    def get(self, key: bytes) -> Optional[Dict]:
+        """Return the stored entry for key, or None if it is missing or expired."""
+        cutoff = (datetime.now() - TM_EXPIRY).isoformat()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT translation, timestamp, direction FROM translations WHERE key = ? AND timestamp >= ?",
+                (key, cutoff)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'translation': row[0], 'timestamp': row[1], 'direction': row[2]}
+
+    def put(self, key: bytes, entry: Dict) -> None:
+        """Queue an entry to be written without blocking the caller."""
+        self._queue.put((key, entry))
+
+    def clear(self) -> None:
+        """Queue removal of every stored entry."""
+        self._queue.put(None)
+
+    def _write_loop(self) -> None:
+        while True:
+            try:
+                items = [self._queue.get(timeout=TM_PURGE_INTERVAL.total_seconds())]
+            except queue.Empty:
+                items = []
+            # Drain whatever else is pending so a burst is committed together
+            while not self._queue.empty():
+                items.append(self._queue.get_nowait())
+            try:
+                with self._lock:
+                    if datetime.now() >= self._next_purge:
+                        self._conn.execute(
+                            "DELETE FROM translations WHERE timestamp < ?",
+                            ((datetime.now() - TM_EXPIRY).isoformat(),)
+                        )
+                        self._next_purge = datetime.now() + TM_PURGE_INTERVAL
+                    for item in items:
+                        if item is None:
+                            self._conn.execute("DELETE FROM translations")
+                        else:
+                            key, entry = item
+                            self._conn.execute(
+                                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)",
+                                (key, entry['translation'], entry['timestamp'], entry['direction'])
+                            )
+                    self._conn.commit()
+            except sqlite3.Error as e:
+                log_error(e, "Translation memory write")
+
+@st.cache_resource
+def get_tm_store() -> TranslationMemoryStore:
+    """Get the on-disk translation memory shared by all sessions."""
+    return TranslationMemoryStore(TM_DB_PATH)
+
+@st.cache_resource
+def get_inflight_requests() -> Tuple[Dict[bytes, threading.Event], threading.Lock]:
+    """Get the translations currently being requested, keyed like the translation memory."""
+    return {}, threading.Lock()
+
+@st.cache_resource
+def get_tm() -> LRUCache:
+    """Get the process-wide in-memory translation memory."""
+    return LRUCache(MAX_TM_ENTRIES)
+
+@st.cache_resource
+def get_response_cache() -> LRUCache:
+    """Get the process-wide cache of API response entries, keyed by request payload."""
+    return LRUCache(MAX_CACHED_RESPONSES)
+
+def get_unexpired(cache: LRUCache, key: bytes) -> Optional[Dict]:
+    """Return the cached entry for key, dropping it instead if it is older than TM_EXPIRY."""
+    entry = cache.get(key)
+    if entry is not None and entry['timestamp'] < (datetime.now() - TM_EXPIRY).isoformat():
+        cache.discard(key)
+        return None
+    return entry
+
+def tm_key(text: str, direction: str) -> bytes:
+    """Build a fixed-size translation memory key from the normalized text and direction."""
+    # Texts that differ only in case, spacing or Unicode compatibility forms share a key,
+    # but a paragraph break is not the same as a space
+    normalized = unicodedata.normalize("NFKC", text).strip()
+    normalized = HORIZONTAL_SPACE_PATTERN.sub(" ", BLANK_LINES_PATTERN.sub("\n\n", normalized)).lower()
+    return hashlib.blake2b(
+        f"{direction}\x00{normalized}".encode('utf-8'),
+        digest_size=16
+    ).digest()
+
 def update_translation_memory(original: str, translated: str, direction: str) -> None:
     """Update translation memory with new translations."""
-    key = f"{original.strip().lower()}_{direction}"
-    if key not in st.session_state.translation_memory:
-        st.session_state.translation_memory[key] = {
-            'translation': translated,
-            'timestamp': datetime.now().isoformat(),
-            'direction': direction
-        }
+    key = tm_key(original, direction)
+    entry = {
+        'translation': translated,
+        'timestamp': datetime.now().isoformat(),
+        'direction': direction
+    }
+    if get_tm().add(key, entry):
+        get_tm_store().put(key, entry)
 
 def get_from_translation_memory(text: str, direction: str) -> str:
-    """Retrieve translation from memory if available."""
-    key = f"{text.strip().lower()}_{direction}"
-    if key in st.session_state.translation_memory:
-        return st.session_state.translation_memory[key]['translation']
-    return None
+    """Retrieve translation from memory if available, falling back to the on-disk store."""
+    key = tm_key(text, direction)
+    entry = get_unexpired(get_tm(), key)
+    if entry is None:
+        entry = get_tm_store().get(key)
+        if entry is None:
+            return None
+        get_tm().add(key, entry)
+    return entry['translation']
+
+def format_sources(sources: Tuple[str, ...]) -> str:
+    """Format reference sources as the bulleted list used in prompts."""
+    return "\n".join(f"- {source}" for source in sources)
 
-def translate_with_context(text: str, direction: str, sources: List[str]) -> Dict:
+def split_paragraphs(text: str) -> List[str]:
+    """Split text into non-empty paragraphs separated by blank lines."""
+    return [paragraph.strip() for paragraph in PARAGRAPH_PATTERN.split(text) if paragraph.strip()]
+
+def read_stream(response: requests.Response, placeholder=None) -> Tuple[str, Optional[str]]:
     """
-    Translate text with context while checking quality and terminology.
+    Read a streamed (server-sent events) Messages API response and return (text, stop_reason).
+
+    The text is rendered into placeholder as it arrives.
     """
-    quality_checker = TranslationQuality()
-    
-    # First check translation memory
-    cached_translation = get_from_translation_memory(text, direction)
-    if cached_translation:
-        st.info("Retrieved from translation memory")
-        return {'status_code': 200, 'content': [{'text': cached_translation}]}
+    text = ""
+    stop_reason = None
+    for line in response.iter_lines():
+        if not line.startswith(b"data:"):
+            continue
+        event = json.loads(line[5:])
+        if event.get('type') == 'content_block_delta':
+            text += event['delta'].get('text', '')
+            if placeholder is not None:
+                placeholder.markdown(text)
+        elif event.get('type') == 'message_delta':
+            stop_reason = event['delta'].get('stop_reason', stop_reason)
+        elif event.get('type') == 'error':
+            raise RuntimeError(event['error'].get('message', "Streaming error"))
+    return text.strip(), stop_reason
 
-    if direction == "no-to-en":
-        prompt_template = """You are a specialist in translating climate negotiation texts from Norwegian to English. Your task is to:
+def response_key(payload: Dict) -> bytes:
+    """Build the response cache key for a request payload."""
+    return hashlib.blake2b(encode_payload(payload), digest_size=16).digest()
 
-        1. First check the reference pages for how similar concepts and expressions are translated:
-        {sources}
+def store_response(key: bytes, text: str) -> None:
+    """Cache a response text in memory and, if new, in the on-disk store."""
+    entry = {
+        'translation': text,
+        'timestamp': datetime.now().isoformat(),
+        'direction': RESPONSE_CACHE_DIRECTION
+    }
+    if get_response_cache().add(key, entry):
+        get_tm_store().put(key, entry)
 
-        2. For technical terms:
-        - Use established English translations from authoritative sources
-        - For terms without direct translations, describe the concept in English and keep Norwegian term in parentheses
-        - When multiple translations exist, use the most widely accepted one
-        - Maintain consistency with IPCC and UNFCCC terminology
+def call_claude(payload: Dict, placeholder=None) -> Tuple[int, str, bool]:
+    """
+    Send a streamed Messages API request and return (status_code, text, complete).
 
-        3. Focus on conveying the same meaning as the original text, not word-for-word translation
+    The text is rendered into placeholder as it arrives. complete is False when the
+    model stopped before finishing its turn, e.g. on reaching max_tokens. Complete,
+    non-empty responses are cached by payload in memory and on disk, so repeating an
+    identical request does not call the API, even after a restart.
+    On errors the text is the response body.
+    """
+    key = response_key(payload)
+    entry = get_unexpired(get_response_cache(), key)
+    if entry is None:
+        # Responses are also kept in the on-disk store, so they survive restarts
+        entry = get_tm_store().get(key)
+        if entry is not None:
+            get_response_cache().add(key, entry)
+    if entry is not None:
+        return 200, entry['translation'], True
 
-        4. Ensure the translation:
-        - Uses appropriate formal language for climate negotiations
-        - Maintains technical precision
-        - Follows standard English capitalization and punctuation rules
-        - Preserves any specific references to Norwegian policies or institutions
+    response = post_message({**payload, "stream": True}, stream=True)
+    if response.status_code != 200:
+        return response.status_code, response.text, False
 
-        Translate this text from Norwegian to English:
-        {text}
+    text, stop_reason = read_stream(response, placeholder)
+    complete = stop_reason == "end_turn"
+    # Truncated or empty replies are not cached, so asking again gets a fresh attempt
+    if complete and text:
+        store_response(key, text)
+    return 200, text, complete
 
-        Note: Pay special attention to how technical terms are used in IPCC reports and UNFCCC documents."""
-    else:
-        prompt_template = """Du er en spesialist i å oversette klimaforhandlingstekster fra engelsk til norsk. Din oppgave er å:
+def call_claude_concurrently(payloads: List[Dict], placeholder=None) -> List[Tuple[int, str, bool]]:
+    """
+    Send several requests at once and return their (status_code, text, complete) results in order.
 
-        1. Først sjekke referansesidene for hvordan lignende begreper og uttrykk er oversatt:
-        {sources}
+    The finished texts are rendered into placeholder in order as they complete.
+    """
+    results: List[Optional[Tuple[int, str, bool]]] = [None] * len(payloads)
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        futures = {executor.submit(call_claude, payload): i for i, payload in enumerate(payloads)}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            if placeholder is not None:
+                done = []
+                for result in results:
+                    if result is None:
+                        break
+                    done.append(result[1])
+                placeholder.markdown("\n\n".join(done))
+    return results
 
-        2. For tekniske termer:
-        - Bruk etablerte norske oversettelser fra referansesidene
-        - For termer som ikke finnes i kildene, beskriv konseptet på norsk og behold engelsk term i parentes
-        - Ved flere brukte oversettelser, vis alternativene
+def translation_memory_response(text: str, translation: str, direction: str) -> Dict:
+    """Build the response for a translation served from memory, validated like a fresh one."""
+    st.info("Retrieved from translation memory")
+    return {
+        'status_code': 200,
+        'content': [{'text': translation}],
+        'validation': get_quality_checker().validate_translation(text, translation, direction),
+        'cached': True
+    }
 
-        3. Fokuser på å formidle samme mening som i originalteksten, ikke ord-for-ord oversettelse
+def translate_with_context(text: str, direction: str, sources: List[str], placeholder=None) -> Dict:
+    """
+    Translate text with context while checking quality and terminology.
 
-        Oversett denne teksten:
-        {text}
+    Paragraphs already in translation memory are reused; the rest are sent in a
+    single streamed request, rendered into placeholder as the text arrives.
+    """
+    text = text.strip()
+    if not text:
+        return {
+            'status_code': 400,
+            'error': {'message': "No text to translate."}
+        }
 
-        Tips: Se spesielt etter hvordan Miljødirektoratet og Regjeringen formulerer lignende konsepter."""
+    # First check translation memory, for the whole text and then per paragraph
+    cached_translation = get_from_translation_memory(text, direction)
+    if cached_translation:
+        return translation_memory_response(text, cached_translation, direction)
 
-    headers = {
-        "anthropic-version": "2023-06-01",
-        "x-api-key": API_KEY,
-        "content-type": "application/json",
-    }
+    paragraphs = split_paragraphs(text)
+    translations = [get_from_translation_memory(paragraph, direction) for paragraph in paragraphs]
+    missing = [i for i, translation in enumerate(translations) if translation is None]
+    if not missing:
+        return translation_memory_response(text, "\n\n".join(translations), direction)
+
+    # Identical requests from other sessions wait for the first one instead of calling the API again
+    key = tm_key(text, direction)
+    inflight, inflight_lock = get_inflight_requests()
+    with inflight_lock:
+        pending = inflight.get(key)
+        if pending is None:
+            inflight[key] = threading.Event()
+    if pending is not None:
+        pending.wait(timeout=INFLIGHT_WAIT)
+        cached_translation = get_from_translation_memory(text, direction)
+        if cached_translation:
+            return translation_memory_response(text, cached_translation, direction)
+        # The first request failed, so make our own
+
+    try:
+        return request_translation(text, direction, sources, paragraphs, translations, missing, placeholder)
+    finally:
+        if pending is None:
+            with inflight_lock:
+                inflight.pop(key).set()
+
+# System blocks for the default sources are rendered once at import
+DEFAULT_SYSTEM_NO_TO_EN = cached_system_prompt(SYSTEM_PROMPT_NO_TO_EN.format(sources=SOURCES_BLOCK))
+DEFAULT_SYSTEM_EN_TO_NO = cached_system_prompt(SYSTEM_PROMPT_EN_TO_NO.format(sources=SOURCES_BLOCK))
+
+def build_translation_payload(text: str, direction: str, sources: List[str]) -> Dict:
+    """Build the Messages API payload that translates text in the given direction."""
+    if direction == "no-to-en":
+        system_prompt, default_system, user_prompt = SYSTEM_PROMPT_NO_TO_EN, DEFAULT_SYSTEM_NO_TO_EN, USER_PROMPT_NO_TO_EN
+    else:
+        system_prompt, default_system, user_prompt = SYSTEM_PROMPT_EN_TO_NO, DEFAULT_SYSTEM_EN_TO_NO, USER_PROMPT_EN_TO_NO
+    if sources is REFERENCE_SITES:
+        system = default_system
+    else:
+        system = cached_system_prompt(system_prompt.format(sources=format_sources(tuple(sources))))
 
-    payload = {
+    return {
+        **BASE_PAYLOAD,
+        "max_tokens": output_token_budget(text),
+        "system": system,
         "messages": [{
             "role": "user",
-            "content": prompt_template.format(
-                sources="\n".join(f"- {source}" for source in sources),
-                text=text
-            )
-        }],
-        "model": "claude-3-sonnet-20240229",
-        "max_tokens": 1000,
-        "temperature": 0.3
+            "content": user_prompt.format(text=text)
+        }]
     }
 
+def request_translation(text: str, direction: str, sources: List[str], paragraphs: List[str],
+                        translations: List[Optional[str]], missing: List[int], placeholder=None) -> Dict:
+    """Translate the missing paragraphs through the API and stitch them into the cached ones."""
+    quality_checker = get_quality_checker()
+    payload = build_translation_payload("\n\n".join(paragraphs[i] for i in missing), direction, sources)
+
     try:
-        response = requests.post(API_ENDPOINT, headers=headers, json=payload)
+        status_code, streamed_text, complete = call_claude(payload, placeholder)
         
-        if response.status_code == 200:
-            result = response.json()
-            translated_text = result["content"][0]["text"]
-            
+        if status_code == 200:
+
+            # Stitch the new paragraphs between the cached ones
+            streamed_paragraphs = split_paragraphs(streamed_text)
+            if complete and len(streamed_paragraphs) == len(missing):
+                for i, translation in zip(missing, streamed_paragraphs):
+                    translations[i] = translation
+                    update_translation_memory(paragraphs[i], translation, direction)
+                translated_text = "\n\n".join(translations)
+                remember = True
+            else:
+                # Paragraph breaks were not preserved or the reply was cut off, so the new text
+                # cannot be placed between the cached paragraphs. Translate the whole text in one
+                # piece instead, and keep it out of memory since it may not match the original.
+                if len(missing) < len(paragraphs):
+                    payload = build_translation_payload(text, direction, sources)
+                    status_code, streamed_text, complete = call_claude(payload, placeholder)
+                translated_text = streamed_text
+                remember = False
+
+        if status_code == 200:
             # Validate translation using our quality checker
             validation_results = quality_checker.validate_translation(text, translated_text, direction)
+            if not complete:
+                validation_results.append({
+                    'type': 'truncation',
+                    'severity': 'high',
+                    'message': "Warning: The response was cut off before the translation was finished"
+                })
             
             # Update translation memory
-            update_translation_memory(text, translated_text, direction)
+            if remember:
+                update_translation_memory(text, translated_text, direction)
             
             # Create a modified response that includes both translation and validation
             return {
@@ -256,8 +954,8 @@ def translate_with_context(text: str, direction: str, sources: List[str]) -> Dic
             }
         else:
             return {
-                'status_code': response.status_code,
-                'error': {'message': f"API error: {response.text}"}
+                'status_code': status_code,
+                'error': {'message': f"API error: {streamed_text}"}
             }
     except Exception as e:
         return {
@@ -265,41 +963,43 @@ def translate_with_context(text: str, direction: str, sources: List[str]) -> Dic
             'error': {'message': f"Translation error: {str(e)}"}
         }
 
-def review_norwegian_text(text: str) -> Dict:
-    """Review and correct Norwegian text."""
-    headers = {
-        "anthropic-version": "2023-06-01",
-        "x-api-key": API_KEY,
-        "content-type": "application/json",
-    }
-
-    prompt = """Du er en ekspert på norsk klimaterminologi. 
-    Korriger følgende tekst med fokus på:
-    - Presist og korrekt fagspråk i klimaforhandlinger
-    - Konsistent bruk av tekniske termer
-    - Korrekt grammatikk og tegnsetting
-    - Formelt språk passende for offisielle dokumenter
-    
-    Gi kun korrigert versjon uten forklaringer.
-    Behold tekniske termer som er korrekte.
-
-    {text}"""
-
-    payload = {
+def build_review_payload(paragraph: str) -> Dict:
+    """Build the Messages API payload that reviews one paragraph of Norwegian text."""
+    return {
+        **BASE_PAYLOAD,
+        "max_tokens": output_token_budget(paragraph),
+        "temperature": REVIEW_TEMPERATURE,
+        "system": cached_system_prompt(SYSTEM_PROMPT_REVIEW),
         "messages": [{
             "role": "user",
-            "content": prompt.format(text=text)
-        }],
-        "model": "claude-3-sonnet-20240229",
-        "max_tokens": 1000,
-        "temperature": 0.3
+            "content": paragraph
+        }]
     }
 
+def review_norwegian_text(text: str, placeholder=None) -> Dict:
+    """
+    Review and correct Norwegian text, rendering the suggestion into placeholder if given.
+
+    A single paragraph is streamed; longer texts are reviewed one paragraph per
+    request, run concurrently and reassembled in order.
+    """
+    payloads = [build_review_payload(paragraph) for paragraph in split_paragraphs(text.strip())]
+
     try:
-        response = requests.post(API_ENDPOINT, headers=headers, json=payload)
-        return response.json() if response.status_code == 200 else {
-            'status_code': response.status_code,
-            'error': {'message': f"Review error: {response.text}"}
+        if len(payloads) == 1:
+            results = [call_claude(payloads[0], placeholder)]
+        else:
+            results = call_claude_concurrently(payloads, placeholder)
+        for status_code, reviewed_text, _ in results:
+            if status_code != 200:
+                return {
+                    'status_code': status_code,
+                    'error': {'message': f"Review error: {reviewed_text}"}
+                }
+        return {
+            'status_code': 200,
+            'content': [{'text': "\n\n".join(reviewed_text for _, reviewed_text, _ in results)}],
+            'truncated': not all(complete for _, _, complete in results)
         }
     except Exception as e:
         return {
@@ -307,6 +1007,92 @@ def review_norwegian_text(text: str) -> Dict:
             'error': {'message': f"Review error: {str(e)}"}
         }
 
+def build_batch_payload(text: str, task: str) -> Dict:
+    """Build the payload for a queued batch item: a review paragraph or a translation."""
+    if task == REVIEW_TASK:
+        return build_review_payload(text)
+    return build_translation_payload(text, task, REFERENCE_SITES)
+
+def submit_batch(items: List[Tuple[str, str]]) -> Dict:
+    """
+    Submit (text, task) pairs as one Message Batches request.
+
+    The task is a translation direction or REVIEW_TASK. Batched requests are billed
+    at half price but finish asynchronously, so the returned batch is polled later
+    with collect_batch.
+    """
+    requests_list = [{
+        "custom_id": str(i),
+        "params": build_batch_payload(text, task)
+    } for i, (text, task) in enumerate(items)]
+
+    try:
+        # ApiRetry only resends this POST on statuses meaning the batch was not created, so a
+        # server error cannot create and bill a second batch whose id is never collected
+        response = get_http_session().post(
+            BATCHES_ENDPOINT,
+            data=encode_payload({"requests": requests_list}),
+            timeout=API_TIMEOUT
+        )
+        if response.status_code != 200:
+            return {
+                'status_code': response.status_code,
+                'error': {'message': f"Batch error: {response.text}"}
+            }
+        return {'status_code': 200, 'batch': {'id': response.json()['id'], 'items': items}}
+    except Exception as e:
+        return {
+            'status_code': 500,
+            'error': {'message': f"Batch error: {str(e)}"}
+        }
+
+def collect_batch(batch: Dict) -> Dict:
+    """
+    Check a submitted batch and, once it has ended, store its results.
+
+    Translations go to translation memory and reviews to the response cache, so
+    translating or reviewing the same text again is served without an API call.
+    Returns the processing status, plus the number of stored results when done.
+    """
+    session = get_http_session()
+    try:
+        response = session.get(f"{BATCHES_ENDPOINT}/{batch['id']}", timeout=API_TIMEOUT)
+        if response.status_code != 200:
+            return {
+                'status_code': response.status_code,
+                'error': {'message': f"Batch error: {response.text}"}
+            }
+        status = response.json()
+        if status['processing_status'] != "ended":
+            return {'status_code': 200, 'processing_status': status['processing_status']}
+
+        stored = 0
+        with session.get(status['results_url'], timeout=API_TIMEOUT, stream=True) as results:
+            for line in results.iter_lines():
+                if not line:
+                    continue
+                entry = json.loads(line)
+                if entry['result']['type'] != "succeeded":
+                    continue
+                message = entry['result']['message']
+                text, task = batch['items'][int(entry['custom_id'])]
+                result_text = "".join(
+                    block['text'] for block in message['content'] if block['type'] == "text"
+                ).strip()
+                # Results cut off at max_tokens are dropped rather than remembered
+                if message.get('stop_reason') != "end_turn" or not result_text:
+                    continue
+                store_response(response_key(build_batch_payload(text, task)), result_text)
+                if task != REVIEW_TASK:
+                    update_translation_memory(text, result_text, task)
+                stored += 1
+        return {'status_code': 200, 'processing_status': "ended", 'stored': stored}
+    except Exception as e:
+        return {
+            'status_code': 500,
+            'error': {'message': f"Batch error: {str(e)}"}
+        }
+
 def calculate_text_area_height(text: str, min_height: int = 200, max_height: int = 800) -> int:
     """
     Calculate appropriate text area height based on content.
@@ -390,14 +1176,18 @@ def render_translation_ui():
     # Put the translate button below both columns
     col1, col2, col3 = st.columns([1, 1, 1])
     with col1:
+        queue_for_batch = st.checkbox("Queue for batch", help="Translate later at half price through the Message Batches API")
         if st.button("Translate", type="primary"):
+            option = st.session_state.get('current_option', 'Norwegian to English')
+            direction = TRANSLATION_DIRECTIONS.get(option, "en-to-no")
             if input_text.strip() == "":
                 st.warning("Please enter text to translate.")
+            elif queue_for_batch:
+                st.session_state.batch_queue.append((input_text.strip(), direction))
+                st.success("Queued for batch translation.")
             else:
                 with st.spinner('Translating...'):
-                    option = st.session_state.get('current_option', 'Norwegian to English')
-                    direction = "no-to-en" if option == "Norwegian to English" else "en-to-no"
-                    response = translate_with_context(input_text, direction, REFERENCE_SITES)
+                    response = translate_with_context(input_text, direction, REFERENCE_SITES, st.empty())
                     
                     if response.get('status_code') == 200:
                         translated_text = response['content'][0]['text']
@@ -424,6 +1214,9 @@ def render_translation_ui():
             st.session_state.original_text = ""  # Clear original text as well
             st.rerun()
 
+    if st.session_state.batch_queue or st.session_state.pending_batch:
+        render_batch_controls()
+
     # Rest of your analysis section remains the same...
     
     # Rest of your code for analysis section...
@@ -454,9 +1247,9 @@ def render_translation_ui():
             
             # Show technical terms in a more organized way
             st.subheader("Technical Terms Analysis")
-            quality_checker = TranslationQuality()
+            quality_checker = get_quality_checker()
             terms = quality_checker.technical_terms
-            used_terms = [term for term in terms.keys() if term.lower() in input_text.lower()]
+            used_terms = find_technical_terms(input_text)
             
             if used_terms:
                 for term in used_terms:
@@ -488,18 +1281,170 @@ def render_translation_ui():
         st.markdown("---")
         st.caption("💾 Translation saved to memory cache")
 
+def render_diff_html(changes: List[Dict]) -> str:
+    """Render word diffs as a single HTML string with deletions struck and insertions underlined."""
+    parts = []
+    for change in changes:
+        if change['type'] == 'equal':
+            parts.append(html.escape(change['text']))
+        else:
+            if change['original']:
+                parts.append(f"<del>{html.escape(change['original'])}</del>")
+            if change['suggested']:
+                parts.append(f"<ins>{html.escape(change['suggested'])}</ins>")
+    return '<div style="white-space: pre-wrap">' + "".join(parts) + "</div>"
+
+def render_review_ui():
+    """Render the Norwegian review interface with the diff and an accept column per change."""
+    st.header("Norwegian Text Review")
+
+    if 'review' not in st.session_state:
+        st.session_state.review = None
+
+    norwegian_text = st.text_area(
+        "Enter Norwegian text to review:",
+        height=calculate_text_area_height(st.session_state.get('norwegian_text', "")),
+        key="norwegian_text"
+    )
+
+    # The review is kept per input text, so reruns from the editor below reuse it
+    review_key = hashlib.blake2b(norwegian_text.encode('utf-8'), digest_size=8).hexdigest()
+    review = st.session_state.review
+    if review is not None and review['key'] != review_key:
+        review = None
+
+    queue_for_batch = st.checkbox("Queue for batch", key="queue_review_for_batch",
+                                  help="Review later at half price through the Message Batches API")
+    if st.button("Review", type="primary"):
+        if norwegian_text.strip() == "":
+            st.warning("Please enter text to review.")
+        elif queue_for_batch:
+            st.session_state.batch_queue.extend(
+                (paragraph, REVIEW_TASK) for paragraph in split_paragraphs(norwegian_text)
+            )
+            st.success("Queued for batch review.")
+        elif review is None:
+            with st.spinner('Reviewing...'):
+                response = review_norwegian_text(norwegian_text, st.empty())
+
+            if response.get('status_code') == 200:
+                suggested_text = response['content'][0]['text']
+                review = {
+                    'key': review_key,
+                    'suggested_text': suggested_text,
+                    'changes': get_word_diffs(norwegian_text, suggested_text),
+                    'decisions': {},
+                    'truncated': response['truncated']
+                }
+                st.session_state.review = review
+                st.rerun()
+            else:
+                error_info = response.get('error', {})
+                error_message = error_info.get('message', 'An unknown error occurred.')
+                st.error(f"Error: {response.get('status_code')} - {error_message}")
+
+    if st.session_state.batch_queue or st.session_state.pending_batch:
+        render_batch_controls()
+
+    if review is None:
+        return
+
+    if review['truncated']:
+        st.warning("The review was cut off before it finished, so changes near the end "
+                   "may be missing or show text as deleted.")
+
+    changes = review['changes']
+    edits = [i for i, change in enumerate(changes) if change['type'] != 'equal']
+    if not edits:
+        st.success("No changes suggested.")
+        return
+
+    st.subheader("Review Changes")
+    # One HTML block for the whole diff instead of a row of widgets per change; st.html
+    # renders it as is, where markdown would end the block at the first blank line
+    st.html(render_diff_html(changes))
+
+    # Ticking boxes inside a form does not rerun the script; Apply submits them all at once
+    with st.form(f"review_form_{review_key}"):
+        decisions = st.data_editor(
+            [{
+                'Original': changes[i]['original'],
+                'Suggested': changes[i]['suggested'],
+                'Accept': False
+            } for i in edits],
+            column_config={'Accept': st.column_config.CheckboxColumn("Accept")},
+            disabled=['Original', 'Suggested'],
+            hide_index=True,
+            width="stretch",
+            key=f"decisions_{review_key}"
+        )
+        st.form_submit_button("Apply")
+    review['decisions'] = {i: row['Accept'] for i, row in zip(edits, decisions)}
+
+    # Rebuild the text in one pass, keeping the original wherever a change is not accepted
+    st.session_state.final_text = "".join(
+        change['text'] if change['type'] == 'equal'
+        else change['suggested'] if review['decisions'].get(i)
+        else change['original']
+        for i, change in enumerate(changes)
+    )
+
+    st.subheader("Final Text")
+    st.text_area(
+        "Reviewed text:",
+        value=st.session_state.final_text,
+        height=calculate_text_area_height(st.session_state.final_text)
+    )
+
+def render_batch_controls():
+    """Render the queued batch translations and reviews with submit and status-check buttons."""
+    with st.expander("Batch Requests", expanded=True):
+        pending = st.session_state.batch_queue
+        batch = st.session_state.pending_batch
+
+        if pending:
+            st.write(f"Queued requests: {len(pending)}")
+            if st.button("Submit batch", disabled=batch is not None):
+                response = submit_batch(pending)
+                if response.get('status_code') == 200:
+                    st.session_state.pending_batch = response['batch']
+                    st.session_state.batch_queue = []
+                    st.rerun()
+                else:
+                    error_info = response.get('error', {})
+                    error_message = error_info.get('message', 'An unknown error occurred.')
+                    st.error(f"Error: {response.get('status_code')} - {error_message}")
+
+        if batch:
+            st.write(f"Submitted batch: {batch['id']} ({len(batch['items'])} requests)")
+            if st.button("Check batch status"):
+                response = collect_batch(batch)
+                if response.get('status_code') != 200:
+                    error_info = response.get('error', {})
+                    error_message = error_info.get('message', 'An unknown error occurred.')
+                    st.error(f"Error: {response.get('status_code')} - {error_message}")
+                elif response['processing_status'] == "ended":
+                    st.session_state.pending_batch = None
+                    st.success(f"Batch finished: {response['stored']} results saved to memory. "
+                               "Translate or review a queued text again to load it.")
+                else:
+                    st.info(f"Batch status: {response['processing_status']}")
+
 def render_sidebar():
     """Render the sidebar with translation memory stats and options."""
     with st.sidebar:
         st.subheader("Translation Memory Stats")
-        st.write(f"Cached translations: {len(st.session_state.translation_memory)}")
-        if st.button("Clear Translation Memory"):
-            st.session_state.translation_memory = {}
-            st.success("Translation memory cleared!")
+        st.write(f"Cached translations: {len(get_tm())}")
+        # The memory is shared by every session and persisted, so clearing is an admin action
+        if ALLOW_TM_CLEAR and st.button("Clear Shared Translation Memory (all users)"):
+            get_tm().clear()
+            get_response_cache().clear()
+            get_tm_store().clear()
+            st.success("Shared translation memory cleared for all users!")
 
         st.session_state.current_option = st.selectbox(
             "Select function:",
-            ("Norwegian to English", "English to Norwegian", "Norwegian Text Review")
+            (*TRANSLATION_DIRECTIONS, "Norwegian Text Review")
         )
 
 def initialize_app():
@@ -518,8 +1463,13 @@ def initialize_app():
     if 'final_text' not in st.session_state:
         st.session_state.final_text = ""
 
+    if 'batch_queue' not in st.session_state:
+        st.session_state.batch_queue = []
+    if 'pending_batch' not in st.session_state:
+        st.session_state.pending_batch = None
+
     # Set up any required environment variables or configurations
-    if not API_KEY:
+    if not get_api_key():
         st.error("API key not found. Please set the CLAUDE_API_KEY environment variable or add it to your secrets.")
         st.stop()
 
@@ -528,7 +1478,7 @@ def display_usage_stats():
     with st.sidebar:
         st.markdown("---")
         st.subheader("Usage Statistics")
-        total_translations = len(st.session_state.translation_memory)
+        total_translations = len(get_tm())
         st.metric("Total Translations", total_translations)
         
         # Calculate success rate
@@ -552,7 +1502,7 @@ def main():
         display_usage_stats()
 
         # Main content area
-        if st.session_state.current_option in ["Norwegian to English", "English to Norwegian"]:
+        if st.session_state.current_option in TRANSLATION_DIRECTIONS:
             render_translation_ui()
         else:
             render_review_ui()